@@ -1,18 +1,40 @@
-from flask import Flask, render_template, send_file
+from flask import Flask, Response, request, render_template, abort, stream_with_context
+from flask_compress import Compress
 import pandas as pd
 import matplotlib
 matplotlib.use('Agg')  # Use non-GUI backend
 import seaborn as sns
-import matplotlib.pyplot as plt
 import numpy as np
 from datetime import datetime
 import io
-import base64
 import os
+import re
+import gc
+import time
+import threading
+from collections import OrderedDict
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import requests
+import xxhash
+from numba import njit, prange, get_num_threads, set_num_threads
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
+from matplotlib.figure import Figure
 
 app = Flask(__name__)
 
+# Compress the HTML and SVG plots, preferring Brotli when the browser supports it.
+# /download is a streamed response and flask-compress never gzips streams, so gzip-only
+# clients get the CSV uncompressed; text/csv stays listed so Brotli clients still get it compressed.
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_LEVEL'] = 4
+app.config['COMPRESS_BR_LEVEL'] = 4
+app.config['COMPRESS_MIMETYPES'] = ['text/html', 'text/css', 'text/csv', 'image/svg+xml']
+Compress(app)
+
 # Set seaborn style
 sns.set_theme(style="whitegrid")
 sns.set_palette("husl")
@@ -21,70 +43,334 @@ sns.set_palette("husl")
 GOOGLE_SHEET_ID = '1modLnxoX48zBDSV495GvOepaNcqXHErUAb0gU5sNQxw'
 GOOGLE_SHEET_URL = f'https://docs.google.com/spreadsheets/d/{GOOGLE_SHEET_ID}/export?format=csv'
 
-def load_survey_data():
-    """Load survey data from Google Sheets"""
+# Reuse one HTTP session so the TLS connection to Google stays alive between refreshes
+_session = requests.Session()
+SHEET_CACHE_TTL = 10  # seconds, matches the dashboard refresh interval
+_sheet_cache = {'etag': None, 'last_modified': None, 'fetched_at': 0.0, 'data': None}
+
+# Same NA markers pd.read_csv uses, so blank answers come through as missing
+CSV_NULL_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+                   '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None',
+                   'n/a', 'nan', 'null']
+CSV_CONVERT_OPTIONS = pa_csv.ConvertOptions(null_values=CSV_NULL_VALUES, strings_can_be_null=True)
+
+# Answers can span several lines; without this the parser splits blocks mid-answer
+CSV_PARSE_OPTIONS = pa_csv.ParseOptions(newlines_in_values=True)
+
+def pandas_column_names(names):
+    """Rename blank and repeated headers the way pd.read_csv does ('Unnamed: 2', 'Q1.1')"""
+    names = [name if name else f'Unnamed: {i}' for i, name in enumerate(names)]
+    counts = {}
+    for i, name in enumerate(names):
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[name] = count + 1
+            name = f'{name}.{count}'
+            count = counts.get(name, 0)
+        names[i] = name
+        counts[name] = count + 1
+    return names
+
+def compact_dtypes(df):
+    """Shrink the parsed sheet: text answers become category, numbers are downcast"""
+    # Categorical codes let answers be counted as small ints instead of hashing strings
+    for column in df.select_dtypes(include='object').columns:
+        df[column] = df[column].astype('category')
+    for column in df.select_dtypes(include='integer').columns:
+        df[column] = pd.to_numeric(df[column], downcast='integer')
+    for column in df.select_dtypes(include='floating').columns:
+        df[column] = pd.to_numeric(df[column], downcast='float')
+    return df
+
+def parse_survey_csv(content):
+    """Parse CSV bytes with pyarrow's multithreaded reader, returning (table, df)"""
+    table = pa_csv.read_csv(pa.BufferReader(content),
+                            read_options=pa_csv.ReadOptions(use_threads=True, block_size=1 << 20),
+                            parse_options=CSV_PARSE_OPTIONS,
+                            convert_options=CSV_CONVERT_OPTIONS)
+    table = table.rename_columns(pandas_column_names(table.column_names))
+    return table, compact_dtypes(table.to_pandas(split_blocks=True))
+
+def load_survey_snapshot():
+    """Load survey data from Google Sheets as an (Arrow table, DataFrame) pair,
+    reusing the last download if the sheet is unchanged"""
+    if _sheet_cache['data'] is not None and time.monotonic() - _sheet_cache['fetched_at'] < SHEET_CACHE_TTL:
+        return _sheet_cache['data']
+    
+    headers = {}
+    if _sheet_cache['data'] is not None:
+        if _sheet_cache['etag']:
+            headers['If-None-Match'] = _sheet_cache['etag']
+        if _sheet_cache['last_modified']:
+            headers['If-Modified-Since'] = _sheet_cache['last_modified']
+    
     try:
-        df = pd.read_csv(GOOGLE_SHEET_URL)
-        return df
+        resp = _session.get(GOOGLE_SHEET_URL, headers=headers, timeout=10)
+        if resp.status_code == 304:
+            _sheet_cache['fetched_at'] = time.monotonic()
+            return _sheet_cache['data']
+        resp.raise_for_status()
+        data = parse_survey_csv(resp.content)
+        if resp.headers.get('ETag') != _sheet_cache['etag']:
+            _plot_cache.clear()
+        _sheet_cache.update(etag=resp.headers.get('ETag'),
+                            last_modified=resp.headers.get('Last-Modified'),
+                            fetched_at=time.monotonic(),
+                            data=data)
+        return data
     except Exception as e:
         print(f"Error loading data from Google Sheets: {e}")
         print("Please ensure the Google Sheet is shared as 'Anyone with the link can view'")
         return None
 
+def count_responses(series):
+    """Count answers to a question (unsorted); categorical columns are counted on their integer codes"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        uniques, counts = np.unique(codes[codes >= 0], return_counts=True)
+        return pd.Series(counts, index=series.cat.categories[uniques])
+    return series.value_counts(sort=False)
+
+# Mis-encoded characters in sheet headers become dashes; runs of whitespace collapse
+_TITLE_TABLE = str.maketrans({'\ufffd': '-'})
+_WHITESPACE = re.compile(r'\s{2,}')
+
+def clean_text(text):
+    """Tidy question text for display in a single pass"""
+    return _WHITESPACE.sub(' ', text.translate(_TITLE_TABLE).strip())
+
 def get_question_mapping():
     """Get question mappings - returns empty dict if no Questions sheet"""
     # For simplicity, we'll use column names directly
     # You can add a second sheet with gid parameter if needed
     return {}
 
-def create_plot(df, column, questions):
-    """Create plot for a column"""
-    fig, ax = plt.subplots(figsize=(10, 6))
-    question_text = questions.get(column, column.strip())
+PLOT_MIMETYPES = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+# Rendered plots keyed on column name + content hash, so unchanged data skips matplotlib
+PLOT_CACHE_SIZE = 256
+_plot_cache = OrderedDict()
+
+def column_digest(series):
+    """Fast content hash of a column"""
+    return xxhash.xxh64(pd.util.hash_pandas_object(series, index=False).values).intdigest()
+
+def _lookup_plot(key):
+    """Return the cached plot for key (marking it recently used), or None on a miss"""
+    plot = _plot_cache.get(key)
+    if plot is not None:
+        _plot_cache.move_to_end(key)
+    return plot
+
+def cached_plot(key, render, *args):
+    """Return the cached plot for key, rendering and storing it on a miss"""
+    plot = _lookup_plot(key)
+    if plot is not None:
+        return plot
+    plot = render(*args)
+    _store_plot(key, plot)
+    return plot
+
+def _store_plot(key, plot):
+    """Add a rendered plot to the cache, evicting the least recently used one"""
+    _plot_cache[key] = plot
+    if len(_plot_cache) > PLOT_CACHE_SIZE:
+        _plot_cache.popitem(last=False)
+
+def _init_worker():
+    """Set up matplotlib/seaborn state in each plot worker process"""
+    matplotlib.use('Agg')
+    sns.set_theme(style="whitegrid")
+    sns.set_palette("husl")
+    # Workers already run one per core, so Numba kernels stay single-threaded inside them
+    set_num_threads(1)
+
+# Plot rendering runs in worker processes so each column gets its own core
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_plot_pool():
+    """Create the plot worker pool on first use (after any fork by the server)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # forkserver avoids forking this multithreaded process while other threads hold locks
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_init_worker,
+                                        mp_context=multiprocessing.get_context('forkserver'))
+    return _pool
+
+def _reset_plot_pool(pool):
+    """Discard a broken pool so the next refresh starts a fresh one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+# Each process reuses one figure/canvas pair; going through pyplot would register
+# every figure in its global manager and leak memory in a long-running server
+_figure = None
+_canvas = None
+
+def _blank_axes(figsize):
+    """Clear the reusable figure and return fresh axes at the given size"""
+    global _figure, _canvas
+    if _figure is None:
+        # Constrained layout fits titles/labels during the draw itself, no second pass needed
+        _figure = Figure(figsize=figsize, layout='constrained')
+        _canvas = FigureCanvas(_figure)
+    # Clear the whole figure rather than just the axes so heatmap colorbars go too
+    _figure.clear()
+    _figure.set_size_inches(figsize)
+    return _figure.add_subplot(111)
+
+def _print_figure(plot_format):
+    """Render the reusable figure to image bytes"""
+    img = io.BytesIO()
+    _canvas.print_figure(img, format=plot_format, dpi=100)
+    return img.getvalue()
+
+@njit(cache=True, parallel=True)
+def _hist_mean(values, edges, nchunks):
+    """Histogram counts and sum of values, binned in parallel chunks over one pass"""
+    nbins = edges.size - 1
+    lo = edges[0]
+    scale = nbins / (edges[nbins] - lo)
+    chunk = (values.size + nchunks - 1) // nchunks
+    # Each chunk fills its own row so threads never write to the same bin
+    partial = np.zeros((nchunks, nbins), np.int64)
+    sums = np.zeros(nchunks)
+    for c in prange(nchunks):
+        for i in range(c * chunk, min((c + 1) * chunk, values.size)):
+            v = values[i]
+            sums[c] += v
+            b = int((v - lo) * scale)
+            if b >= nbins:
+                b = nbins - 1
+            # Same correction as np.histogram for values landing on an interior edge
+            if v < edges[b]:
+                b -= 1
+            elif b != nbins - 1 and v >= edges[b + 1]:
+                b += 1
+            partial[c, b] += 1
+    counts = np.zeros(nbins, np.int64)
+    for c in range(nchunks):
+        counts += partial[c]
+    return counts, sums.sum()
+
+def histogram_with_mean(values, bins=10):
+    """Histogram (counts, edges) and mean of a float64 array, NaNs already removed"""
+    if values.size == 0:
+        return np.zeros(bins, np.int64), np.linspace(0.0, 1.0, bins + 1), np.nan
+    lo, hi = values.min(), values.max()
+    if lo == hi:
+        # Same fallback as np.histogram for a single distinct value
+        lo, hi = lo - 0.5, hi + 0.5
+    edges = np.linspace(lo, hi, bins + 1)
+    # The chunk count is passed in (not read inside the kernel) so cache=True can persist it
+    counts, total = _hist_mean(values, edges, get_num_threads())
+    return counts, edges, total / values.size
+
+def plot_key(df, column, questions):
+    """Cache key for a column's plot"""
+    return ('plot', column, questions.get(column), column_digest(df[column]))
+
+def plot_etag(key):
+    """HTTP ETag for a plot, stable across re-renders and server workers"""
+    return xxhash.xxh64(repr(key).encode('utf-8')).hexdigest()
+
+def create_plots(df, keys, questions, counts_map=None):
+    """Create plots for the columns in keys (column -> plot_key), rendering cache misses in parallel"""
+    counts_map = counts_map or {}
+    columns = list(keys)
+    plots = {}
+    missing = []
+    for column in columns:
+        plots[column] = _lookup_plot(keys[column])
+        if plots[column] is None:
+            missing.append(column)
+    
+    # Only the needed column is pickled to the worker, not the whole DataFrame
+    pool = get_plot_pool()
+    try:
+        rendered = list(pool.map(_render_plot,
+                                 [df[column] for column in missing],
+                                 [questions.get(column, column.strip()) for column in missing],
+                                 [counts_map.get(column) for column in missing]))
+    except BrokenProcessPool:
+        # A crashed worker breaks the pool for good, so replace it rather than fail forever
+        _reset_plot_pool(pool)
+        raise
+    for column, plot in zip(missing, rendered):
+        _store_plot(keys[column], plot)
+        plots[column] = plot
+    return plots
+
+def _render_plot(series, question_text, precomputed_counts=None):
+    """Render plot for a column, returning (format, data)"""
+    ax = _blank_axes((10, 6))
     
     # Clean and truncate title
-    clean_title = question_text.replace('�', '-').replace('  ', ' ')
+    clean_title = clean_text(question_text)
     if len(clean_title) > 80:
         clean_title = clean_title[:77] + '...'
     
-    if df[column].dtype in [np.int64, np.float64]:
+    if series.dtype.kind in 'iuf':
         # Numerical data - histogram
-        sns.histplot(data=df, x=column, bins=10, kde=True, ax=ax, color='steelblue')
+        values = series.dropna().to_numpy(dtype=np.float64)
+        counts, edges, mean_val = histogram_with_mean(values, bins=10)
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', color='steelblue', edgecolor='white')
         ax.set_title(clean_title, fontweight='bold', fontsize=9, wrap=True, pad=10)
         ax.set_xlabel('Rating')
         ax.set_ylabel('Frequency')
-        mean_val = df[column].mean()
         ax.axvline(mean_val, color='red', linestyle='--', linewidth=2, label=f'Mean: {mean_val:.1f}')
         ax.legend()
+        plot_format = 'png'
     else:
         # Categorical data - bar chart
-        counts = df[column].value_counts()
+        counts = precomputed_counts if precomputed_counts is not None else count_responses(series)
+        counts = counts.sort_values(ascending=False, kind='stable')
         # Truncate long labels
         display_labels = [str(label)[:50] + '...' if len(str(label)) > 50 else str(label) for label in counts.index]
         sns.barplot(x=counts.values, y=display_labels, ax=ax, hue=display_labels, palette='viridis', legend=False)
         ax.set_xlabel('Number of Responses')
         ax.set_ylabel('')
         ax.set_title(clean_title, fontweight='bold', fontsize=9, wrap=True, pad=10)
-        for i, v in enumerate(counts.values):
-            ax.text(v + 0.1, i, str(v), va='center', fontweight='bold', fontsize=9)
-    
-    plt.tight_layout(pad=2.0)
-    
-    # Convert plot to base64 string
-    img = io.BytesIO()
-    plt.savefig(img, format='png', dpi=100, bbox_inches='tight')
-    img.seek(0)
-    plot_url = base64.b64encode(img.getvalue()).decode()
-    plt.close(fig)
+        # seaborn makes one bar container per hue level, so label each container
+        for bars in ax.containers:
+            ax.bar_label(bars, fmt='%d', padding=3, fontweight='bold', fontsize=9)
+        # Bar charts are mostly text, so SVG skips rasterizing and is smaller
+        plot_format = 'svg'
     
-    return plot_url
+    return plot_format, _print_figure(plot_format)
+
+def crosstab_counts(s1, s2):
+    """Two-way answer counts from category codes, returning (matrix, row labels, column labels)"""
+    c1 = s1.astype('category')
+    c2 = s2.astype('category')
+    codes1 = c1.cat.codes.to_numpy()
+    codes2 = c2.cat.codes.to_numpy()
+    answered = (codes1 >= 0) & (codes2 >= 0)
+    matrix = np.zeros((len(c1.cat.categories), len(c2.cat.categories)), np.int64)
+    np.add.at(matrix, (codes1[answered], codes2[answered]), 1)
+    # Like pd.crosstab, leave out answers that never appear alongside the other question
+    rows = matrix.sum(axis=1) > 0
+    cols = matrix.sum(axis=0) > 0
+    return matrix[rows][:, cols], c1.cat.categories[rows], c2.cat.categories[cols]
 
 def create_cross_analysis(df, col1, col2, questions):
-    """Create cross-tabulation heatmap"""
-    fig, ax = plt.subplots(figsize=(8, 6))
+    """Create cross-tabulation heatmap, reusing the cached image if both columns are unchanged"""
+    key = ('cross', col1, col2, questions.get(col1), questions.get(col2),
+           column_digest(df[col1]), column_digest(df[col2]))
+    return cached_plot(key, _render_cross_analysis, df, col1, col2, questions)
+
+def _render_cross_analysis(df, col1, col2, questions):
+    """Render cross-tabulation heatmap as SVG, returning (format, data)"""
+    ax = _blank_axes((8, 6))
     try:
-        cross_tab = pd.crosstab(df[col1], df[col2])
-        sns.heatmap(cross_tab, annot=True, fmt='d', cmap='YlOrRd', ax=ax, cbar_kws={'label': 'Count'})
+        matrix, row_labels, col_labels = crosstab_counts(df[col1], df[col2])
+        sns.heatmap(matrix, annot=True, fmt='d', cmap='YlOrRd', ax=ax, cbar_kws={'label': 'Count'},
+                    xticklabels=list(col_labels), yticklabels=list(row_labels))
         q1 = questions.get(col1, col1)
         q2 = questions.get(col2, col2)
         ax.set_title(f"{q1[:30]}... vs {q2[:30]}...", fontweight='bold', fontsize=10)
@@ -93,23 +379,15 @@ def create_cross_analysis(df, col1, col2, questions):
     except:
         ax.text(0.5, 0.5, 'Insufficient data', ha='center', va='center', transform=ax.transAxes)
     
-    plt.tight_layout()
-    
-    img = io.BytesIO()
-    plt.savefig(img, format='png', dpi=100, bbox_inches='tight')
-    img.seek(0)
-    plot_url = base64.b64encode(img.getvalue()).decode()
-    plt.close(fig)
-    
-    return plot_url
+    return 'svg', _print_figure('svg')
 
-@app.route('/')
-def dashboard():
-    """Main dashboard page"""
-    df = load_survey_data()
+def build_dashboard():
+    """Load the sheet and compute everything the dashboard template needs"""
+    snapshot = load_survey_snapshot()
     
-    if df is None:
-        return "<h1>Error loading survey data!</h1><p>Make sure the Google Sheet is publicly accessible.</p>"
+    if snapshot is None:
+        return None
+    table, df = snapshot
     
     questions = get_question_mapping()
     
@@ -133,20 +411,22 @@ def dashboard():
     excluded_cols = ['timestamp', 'Timestamp', 'Email Address', 'email', 'Email', 'Name', 'Age', 'Age ', 'Are you a resident of Ahmedabad ?']
     all_question_cols = [col for col in df.columns if col not in excluded_cols]
     
-    # Calculate top responses for each question
+    # Count responses once per question; the plots below reuse these
+    counts_map = {column: count_responses(df[column]) for column in all_question_cols}
+    
+    # Calculate top responses for each question, skipping unanswered ones
+    all_missing = df.isna().all()
     for column in all_question_cols:
-        if column in df.columns and not df[column].isna().all():
-            value_counts = df[column].value_counts()
-            if len(value_counts) > 0:
-                top_value = value_counts.index[0]
-                top_count = value_counts.iloc[0]
+        if not all_missing[column]:
+            # Only the most common answer is needed, so select it instead of sorting
+            top = counts_map[column].nlargest(1)
+            if len(top) > 0:
+                top_value = top.index[0]
+                top_count = top.iloc[0]
                 percentage = (top_count / len(df)) * 100
                 
-                # Clean question text
-                clean_question = column.strip().replace('\ufffd', '-').replace('  ', ' ')
-                
                 key_insights.append({
-                    'question': clean_question,
+                    'question': clean_text(column),
                     'top_answer': str(top_value),
                     'percentage': int(percentage),
                     'count': int(top_count),
@@ -157,43 +437,123 @@ def dashboard():
     numerical_cols = df.select_dtypes(include=[np.number]).columns.tolist()
     numerical_cols = [col for col in numerical_cols if col not in excluded_cols]
     
-    avg_rating = df[numerical_cols].mean().mean() if numerical_cols else 0
+    column_means = df[numerical_cols].mean()
+    avg_rating = column_means.mean() if numerical_cols else 0
     total_questions = len(all_question_cols)
     
     # Create simplified plots for key questions (max 4 most important)
     plots = []
-    priority_questions = all_question_cols[:4]  # Show only first 4 questions
+    images = {}
+    priority_questions = [col for col in all_question_cols[:4] if col in df.columns]  # Show only first 4 questions
     
+    keys = {column: plot_key(df, column, questions) for column in priority_questions}
+    rendered = create_plots(df, keys, questions, counts_map)
     for column in priority_questions:
-        if column in df.columns:
-            plot_url = create_plot(df, column, questions)
-            plots.append({
-                'question': questions.get(column, column.strip()[:60]),
-                'plot': plot_url
-            })
-    
-    return render_template('dashboard.html',
-                         total_responses=total_responses,
-                         latest=latest,
-                         avg_rating=f"{avg_rating:.2f}",
-                         total_questions=total_questions,
-                         current_time=datetime.now().strftime('%H:%M:%S'),
-                         plots=plots,
-                         key_insights=key_insights[:6])  # Top 6 insights
+        plot_format, plot_data = rendered[column]
+        images[column] = {
+            'data': plot_data,
+            'mimetype': PLOT_MIMETYPES[plot_format],
+            # Derived from the column data, not the image bytes: SVG output embeds a
+            # render date and random ids, so identical plots differ byte-for-byte
+            'etag': plot_etag(keys[column])
+        }
+        plots.append({
+            'question': questions.get(column, column.strip()[:60]),
+            'column': column
+        })
+    
+    context = dict(total_responses=total_responses,
+                   latest=latest,
+                   avg_rating=f"{avg_rating:.2f}",
+                   total_questions=total_questions,
+                   current_time=datetime.now().strftime('%H:%M:%S'),
+                   plots=plots,
+                   key_insights=key_insights[:6])  # Top 6 insights
+    # The raw table rides along so /download never has to touch the loader itself
+    return {'context': context, 'images': images, 'table': table}
+
+# The dashboard is rebuilt in the background and requests serve the latest
+# payload, so page loads never wait on Google Sheets or matplotlib
+_state = {'payload': None}
+_first_refresh = threading.Event()
+_refresher_lock = threading.Lock()
+_refresher = None
+
+def _refresh_loop():
+    """Rebuild the dashboard payload every SHEET_CACHE_TTL seconds"""
+    while True:
+        try:
+            payload = build_dashboard()
+            if payload is not None:
+                # Swapping the dict entry is atomic, readers see the old or new payload
+                _state['payload'] = payload
+        except Exception as e:
+            print(f"Error refreshing dashboard: {e}")
+        _first_refresh.set()
+        # Drop any matplotlib/pandas garbage from this build before the next one
+        gc.collect()
+        time.sleep(SHEET_CACHE_TTL)
+
+def start_refresher():
+    """Start the background refresher thread once per process"""
+    global _refresher
+    with _refresher_lock:
+        if _refresher is None:
+            _refresher = threading.Thread(target=_refresh_loop, name='dashboard-refresher', daemon=True)
+            _refresher.start()
+
+def current_payload():
+    """Latest dashboard payload, starting this worker's refresher if needed"""
+    start_refresher()
+    _first_refresh.wait(timeout=60)
+    return _state['payload']
+
+@app.route('/')
+def dashboard():
+    """Main dashboard page"""
+    payload = current_payload()
+    
+    if payload is None:
+        return "<h1>Error loading survey data!</h1><p>Make sure the Google Sheet is publicly accessible.</p>"
+    
+    return render_template('dashboard.html', **payload['context'])
+
+@app.route('/plot/<path:column>')
+def plot_image(column):
+    """Serve a dashboard plot so browsers can cache it across refreshes"""
+    payload = current_payload()
+    if payload is None or column not in payload['images']:
+        abort(404)
+    
+    image = payload['images'][column]
+    # A plain (non-streamed) response lets flask-compress keep honouring If-None-Match;
+    # it treats send_file output as a stream and skips conditional handling
+    response = Response(image['data'], mimetype=image['mimetype'])
+    response.set_etag(image['etag'])
+    response.headers['Cache-Control'] = 'public, max-age=10, stale-while-revalidate=60'
+    return response.make_conditional(request)
+
+def iter_csv_chunks(table, rows_per_chunk=4096):
+    """Yield the table as CSV bytes, a batch of rows at a time"""
+    include_header = True
+    for batch in table.to_batches(max_chunksize=rows_per_chunk) or [table]:
+        sink = pa.BufferOutputStream()
+        pa_csv.write_csv(batch, sink, write_options=pa_csv.WriteOptions(include_header=include_header))
+        include_header = False
+        yield sink.getvalue().to_pybytes()
 
 @app.route('/download')
 def download():
     """Download data as CSV"""
-    df = load_survey_data()
-    if df is None:
+    payload = current_payload()
+    if payload is None:
         return "Error: Could not load data", 500
     
-    # Create CSV in memory
-    csv_data = df.to_csv(index=False)
-    return csv_data, 200, {
+    # Stream the CSV in chunks instead of building the whole file in memory
+    return Response(stream_with_context(iter_csv_chunks(payload['table'])), 200, {
         'Content-Type': 'text/csv',
         'Content-Disposition': f'attachment; filename=survey_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-    }
+    })
 
 if __name__ == '__main__':
     print("\n" + "="*60)
@@ -3,8 +3,16 @@ import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 import numpy as np
+import re
 from datetime import datetime
+import io
 import time
+import threading
+import requests
+import xxhash
+from streamlit_autorefresh import st_autorefresh
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 
 # Set page configuration
 st.set_page_config(
@@ -40,18 +48,105 @@ st.markdown("""
 GOOGLE_SHEET_ID = '1modLnxoX48zBDSV495GvOepaNcqXHErUAb0gU5sNQxw'
 GOOGLE_SHEET_URL = f'https://docs.google.com/spreadsheets/d/{GOOGLE_SHEET_ID}/export?format=csv'
 
+# Same NA markers pd.read_csv uses, so blank answers come through as missing
+CSV_NULL_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+                   '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None',
+                   'n/a', 'nan', 'null']
+CSV_CONVERT_OPTIONS = pa_csv.ConvertOptions(null_values=CSV_NULL_VALUES, strings_can_be_null=True)
+
+# Answers can span several lines; without this the parser splits blocks mid-answer
+CSV_PARSE_OPTIONS = pa_csv.ParseOptions(newlines_in_values=True)
+
+def pandas_column_names(names):
+    """Rename blank and repeated headers the way pd.read_csv does ('Unnamed: 2', 'Q1.1')"""
+    names = [name if name else f'Unnamed: {i}' for i, name in enumerate(names)]
+    counts = {}
+    for i, name in enumerate(names):
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[name] = count + 1
+            name = f'{name}.{count}'
+            count = counts.get(name, 0)
+        names[i] = name
+        counts[name] = count + 1
+    return names
+
+SHEET_CACHE_TTL = 10  # seconds, matches the dashboard refresh interval
+
+# Keep one HTTP session and the last download alive across Streamlit reruns
+@st.cache_resource
+def get_sheet_client():
+    """Shared HTTP session plus the ETag/Last-Modified of the last download"""
+    # Every browser session shares this object, so fetches and updates go through the lock
+    return {'session': requests.Session(), 'lock': threading.Lock(),
+            'etag': None, 'last_modified': None, 'fetched_at': 0.0, 'df': None}
+
 # Function to load survey data from Google Sheets
-@st.cache_data(ttl=10)  # Cache data for 10 seconds
 def load_survey_data():
-    """Load survey data from Google Sheets"""
+    """Load survey data from Google Sheets, reusing the last download if the sheet is unchanged"""
+    client = get_sheet_client()
     try:
-        df = pd.read_csv(GOOGLE_SHEET_URL)
-        return df
+        with client['lock']:
+            # Sessions rerunning within the TTL share the last download without a request
+            if client['df'] is not None and time.monotonic() - client['fetched_at'] < SHEET_CACHE_TTL:
+                return client['df']
+            
+            headers = {}
+            if client['df'] is not None:
+                if client['etag']:
+                    headers['If-None-Match'] = client['etag']
+                if client['last_modified']:
+                    headers['If-Modified-Since'] = client['last_modified']
+            
+            resp = client['session'].get(GOOGLE_SHEET_URL, headers=headers, timeout=10)
+            if resp.status_code == 304:
+                client['fetched_at'] = time.monotonic()
+                return client['df']
+            resp.raise_for_status()
+            table = pa_csv.read_csv(pa.BufferReader(resp.content),
+                                    read_options=pa_csv.ReadOptions(use_threads=True, block_size=1 << 20),
+                                    parse_options=CSV_PARSE_OPTIONS,
+                                    convert_options=CSV_CONVERT_OPTIONS)
+            table = table.rename_columns(pandas_column_names(table.column_names))
+            df = compact_dtypes(table.to_pandas(split_blocks=True, self_destruct=True))
+            del table
+            client.update(etag=resp.headers.get('ETag'),
+                          last_modified=resp.headers.get('Last-Modified'),
+                          fetched_at=time.monotonic(),
+                          df=df)
+            return df
     except Exception as e:
         st.error(f"⚠️ Error loading survey data from Google Sheets: {str(e)}")
         st.error("Please ensure the Google Sheet is shared as 'Anyone with the link can view'")
         return None
 
+def compact_dtypes(df):
+    """Shrink the parsed sheet: text answers become category, numbers are downcast"""
+    # Categorical codes let answers be counted as small ints instead of hashing strings
+    for column in df.select_dtypes(include='object').columns:
+        df[column] = df[column].astype('category')
+    for column in df.select_dtypes(include='integer').columns:
+        df[column] = pd.to_numeric(df[column], downcast='integer')
+    for column in df.select_dtypes(include='floating').columns:
+        df[column] = pd.to_numeric(df[column], downcast='float')
+    return df
+
+# Mis-encoded characters in sheet headers become dashes; runs of whitespace collapse
+_TITLE_TABLE = str.maketrans({'\ufffd': '-'})
+_WHITESPACE = re.compile(r'\s{2,}')
+
+def clean_text(text):
+    """Tidy question text for display in a single pass"""
+    return _WHITESPACE.sub(' ', text.translate(_TITLE_TABLE).strip())
+
+def count_responses(series):
+    """Count answers to a question (unsorted); categorical columns are counted on their integer codes"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        uniques, counts = np.unique(codes[codes >= 0], return_counts=True)
+        return pd.Series(counts, index=series.cat.categories[uniques])
+    return series.value_counts(sort=False)
+
 def get_question_mapping():
     """Get question mappings - returns empty dict if no Questions sheet"""
     # For simplicity, we'll use column names directly
@@ -60,7 +155,7 @@ def get_question_mapping():
 
 def plot_categorical_distribution(df, column, title, ax, horizontal=True):
     """Plot distribution for categorical data"""
-    counts = df[column].value_counts()
+    counts = count_responses(df[column]).sort_values(ascending=False, kind='stable')
     # Truncate long labels for better display
     display_labels = [str(label)[:50] + '...' if len(str(label)) > 50 else str(label) for label in counts.index]
     
@@ -68,17 +163,16 @@ def plot_categorical_distribution(df, column, title, ax, horizontal=True):
         sns.barplot(x=counts.values, y=display_labels, ax=ax, hue=display_labels, palette='viridis', legend=False)
         ax.set_xlabel('Number of Responses')
         ax.set_ylabel('')
-        for i, v in enumerate(counts.values):
-            ax.text(v + 0.1, i, str(v), va='center', fontweight='bold', fontsize=9)
     else:
         sns.barplot(x=display_labels, y=counts.values, ax=ax, hue=display_labels, palette='viridis', legend=False)
         ax.set_ylabel('Number of Responses')
         ax.set_xlabel('')
         ax.tick_params(axis='x', rotation=45)
-        for i, v in enumerate(counts.values):
-            ax.text(i, v + 0.1, str(v), ha='center', fontweight='bold', fontsize=9)
+    # seaborn makes one bar container per hue level, so label each container
+    for bars in ax.containers:
+        ax.bar_label(bars, fmt='%d', padding=3, fontweight='bold', fontsize=9)
     # Truncate title and clean special characters
-    clean_title = title.strip().replace('�', '-').replace('  ', ' ')
+    clean_title = clean_text(title)
     if len(clean_title) > 80:
         clean_title = clean_title[:77] + '...'
     ax.set_title(clean_title, fontweight='bold', fontsize=9, wrap=True, pad=10)
@@ -95,11 +189,26 @@ def plot_numerical_distribution(df, column, title, ax):
     ax.legend()
     return ax
 
+def crosstab_counts(s1, s2):
+    """Two-way answer counts from category codes, returning (matrix, row labels, column labels)"""
+    c1 = s1.astype('category')
+    c2 = s2.astype('category')
+    codes1 = c1.cat.codes.to_numpy()
+    codes2 = c2.cat.codes.to_numpy()
+    answered = (codes1 >= 0) & (codes2 >= 0)
+    matrix = np.zeros((len(c1.cat.categories), len(c2.cat.categories)), np.int64)
+    np.add.at(matrix, (codes1[answered], codes2[answered]), 1)
+    # Like pd.crosstab, leave out answers that never appear alongside the other question
+    rows = matrix.sum(axis=1) > 0
+    cols = matrix.sum(axis=0) > 0
+    return matrix[rows][:, cols], c1.cat.categories[rows], c2.cat.categories[cols]
+
 def create_cross_analysis(df, col1, col2, title, ax):
     """Create cross-tabulation heatmap"""
     try:
-        cross_tab = pd.crosstab(df[col1], df[col2])
-        sns.heatmap(cross_tab, annot=True, fmt='d', cmap='YlOrRd', ax=ax, cbar_kws={'label': 'Count'})
+        matrix, row_labels, col_labels = crosstab_counts(df[col1], df[col2])
+        sns.heatmap(matrix, annot=True, fmt='d', cmap='YlOrRd', ax=ax, cbar_kws={'label': 'Count'},
+                    xticklabels=list(col_labels), yticklabels=list(row_labels))
         ax.set_title(title, fontweight='bold', fontsize=10)
         ax.set_xlabel(col2)
         ax.set_ylabel(col1)
@@ -109,8 +218,28 @@ def create_cross_analysis(df, col1, col2, title, ax):
         ax.set_title(title, fontweight='bold', fontsize=10)
     return ax
 
+def render_png(fig):
+    """Render a figure to PNG bytes and close it"""
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=200)
+    plt.close(fig)
+    return buf.getvalue()
+
+def get_rendered_figures(df):
+    """Rendered plots for this data, kept in session state until the sheet changes"""
+    digest = xxhash.xxh64(pd.util.hash_pandas_object(df).values)
+    digest.update(repr(list(df.columns)).encode('utf-8'))
+    data_hash = digest.intdigest()
+    if st.session_state.get('figs_hash') != data_hash:
+        st.session_state['figs'] = {}
+        st.session_state['figs_hash'] = data_hash
+    return st.session_state['figs']
+
 # Main dashboard
 def main():
+    # Rerun every 10 seconds to pick up new responses
+    st_autorefresh(interval=10000, key='refresh')
+    
     # Header
     st.markdown('<div class="main-header">🚌 Transit Talks</div>', unsafe_allow_html=True)
     
@@ -172,13 +301,16 @@ def main():
     st.subheader("📊 Survey Results Analysis")
     
     # Separate columns into categorical and numerical
-    categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+    categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
     excluded_cols = ['timestamp', 'Timestamp', 'Email Address', 'email', 'Email']
     categorical_cols = [col for col in categorical_cols if col not in excluded_cols]
     
     # Create visualizations dynamically
     all_question_cols = [col for col in df.columns if col not in excluded_cols]
     
+    # Plots are only redrawn when the sheet data changes
+    figs = get_rendered_figures(df)
+    
     # Plot all questions in a grid
     num_questions = len(all_question_cols)
     cols_per_row = 2
@@ -194,20 +326,20 @@ def main():
                 column_name = all_question_cols[question_idx]
                 
                 with viz_cols[col_idx]:
-                    # Get question text from mapping or use column name
-                    question_text = questions.get(column_name, column_name.strip())
-                    
-                    fig, ax = plt.subplots(figsize=(10, 6))
-                    
-                    # Determine if numerical or categorical
-                    if df[column_name].dtype in [np.int64, np.float64]:
-                        plot_numerical_distribution(df, column_name, question_text, ax)
-                    else:
-                        plot_categorical_distribution(df, column_name, question_text, ax, horizontal=True)
-                    
-                    plt.tight_layout(pad=2.0)
-                    st.pyplot(fig)
-                    plt.close()
+                    if column_name not in figs:
+                        # Get question text from mapping or use column name
+                        question_text = questions.get(column_name, column_name.strip())
+                        
+                        fig, ax = plt.subplots(figsize=(10, 6), layout='constrained')
+                        
+                        # Determine if numerical or categorical
+                        if df[column_name].dtype.kind in 'iuf':
+                            plot_numerical_distribution(df, column_name, question_text, ax)
+                        else:
+                            plot_categorical_distribution(df, column_name, question_text, ax, horizontal=True)
+                        
+                        figs[column_name] = render_png(fig)
+                    st.image(figs[column_name], use_container_width=True)
     
     st.divider()
     
@@ -220,25 +352,27 @@ def main():
         # Select two categorical columns for cross-analysis
         with cross_cols[0]:
             if len(categorical_cols) >= 2:
-                fig, ax = plt.subplots(figsize=(8, 6))
-                q1 = questions.get(categorical_cols[0], categorical_cols[0])
-                q2 = questions.get(categorical_cols[1], categorical_cols[1])
-                create_cross_analysis(df, categorical_cols[0], categorical_cols[1], 
-                                    f"{q1[:30]}... vs {q2[:30]}...", ax)
-                plt.tight_layout()
-                st.pyplot(fig)
-                plt.close()
+                key = ('cross', categorical_cols[0], categorical_cols[1])
+                if key not in figs:
+                    fig, ax = plt.subplots(figsize=(8, 6), layout='constrained')
+                    q1 = questions.get(categorical_cols[0], categorical_cols[0])
+                    q2 = questions.get(categorical_cols[1], categorical_cols[1])
+                    create_cross_analysis(df, categorical_cols[0], categorical_cols[1], 
+                                        f"{q1[:30]}... vs {q2[:30]}...", ax)
+                    figs[key] = render_png(fig)
+                st.image(figs[key], use_container_width=True)
         
         with cross_cols[1]:
             if len(categorical_cols) >= 3:
-                fig, ax = plt.subplots(figsize=(8, 6))
-                q1 = questions.get(categorical_cols[1], categorical_cols[1])
-                q2 = questions.get(categorical_cols[2], categorical_cols[2])
-                create_cross_analysis(df, categorical_cols[1], categorical_cols[2], 
-                                    f"{q1[:30]}... vs {q2[:30]}...", ax)
-                plt.tight_layout()
-                st.pyplot(fig)
-                plt.close()
+                key = ('cross', categorical_cols[1], categorical_cols[2])
+                if key not in figs:
+                    fig, ax = plt.subplots(figsize=(8, 6), layout='constrained')
+                    q1 = questions.get(categorical_cols[1], categorical_cols[1])
+                    q2 = questions.get(categorical_cols[2], categorical_cols[2])
+                    create_cross_analysis(df, categorical_cols[1], categorical_cols[2], 
+                                        f"{q1[:30]}... vs {q2[:30]}...", ax)
+                    figs[key] = render_png(fig)
+                st.image(figs[key], use_container_width=True)
         
         st.divider()
     
@@ -289,10 +423,6 @@ def main():
     # Auto-refresh message
     st.markdown("---")
     st.caption("⏱️ Dashboard auto-refreshes every 10 seconds to fetch latest data from Google Sheets")
-    
-    # Trigger auto-refresh after 10 seconds
-    time.sleep(10)
-    st.rerun()
 
 if __name__ == "__main__":
     main()
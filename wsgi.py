@@ -0,0 +1,5 @@
+"""WSGI entry point for running the Flask dashboard under gunicorn"""
+from app import app
+
+if __name__ == '__main__':
+    app.run()